@@ -0,0 +1,162 @@
+"""
+Synthetic MTS793 dataset generator for TFD_new.py
+
+Writes specimen.dat files under the same <condition>/MTS/<NAME>/ layout as WP1_TENSILE, plus an
+InputGraphs manifest, so the pipeline can be tested offline at campaign scale (1000+ specimens).
+
+The files copy the MTS793 header, randomly swap the order of the 'Analog In 1'/'Analog In 2'
+columns (as DAQ_camera.dat does compared with specimen.dat) and contain a noisy force-elongation
+curve: low-load preload rows, elastic rise, hardening, necking, fracture drop and trailing
+low-load rows.
+
+Usage:
+    python generate_synthetic_TFD.py synthetic --specimens 1000 --rows 60000 --noise 0.01
+    python TFD_new.py synthetic/InputGraphsSYN.xlsx --home-dir synthetic
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import TFD_new
+
+
+SAMPLE_PERIOD = 0.0146484375  # s, acquisition rate of the real specimen.dat files
+CONDITIONS = ['AIR', 'H2_HC1']
+MATERIALS = ['WP1a_BM3', 'WP1a_BM4']
+MTS793_PREAMBLE = 'MTS793|MPT|ENU|1|2|.|/|:|1|0|0|A'
+
+
+def synthetic_curve(n_rows, rng, peak_force=20.0, noise=0.01, ductility=1.0):
+    """
+    Force-elongation curve of one tensile test.
+
+    Args:
+        n_rows (int): Number of samples.
+        rng (np.random.Generator): Random generator.
+        peak_force (float): Ultimate force [kN].
+        noise (float): Standard deviation of the force noise [kN]. The extensometer and
+            displacement noise are scaled from it.
+        ductility (float): Relative elongation at fracture (1.0 ~ 7.5 V extensometer signal).
+
+    Returns:
+        dict: Column name -> array, for the Time, ESH B Force, ESH B Displacement and extensometer
+            channels ('extensometer' is mapped onto Analog In 1/2 by the caller).
+    """
+    time = np.arange(1, n_rows + 1) * SAMPLE_PERIOD
+    preload = int(rng.uniform(0.002, 0.01) * n_rows)
+    fracture = int(rng.uniform(0.97, 0.995) * n_rows)
+    uts = rng.uniform(0.45, 0.85)  # position of the maximum force between preload and fracture
+
+    # Loading progress 0..1 between the end of the preload and fracture
+    u = np.clip((np.arange(n_rows) - preload) / (fracture - preload), 0, None)
+    tau = rng.uniform(0.02, 0.06)
+    hardening = (1 - np.exp(-u / tau)) / (1 - np.exp(-uts / tau))
+    necking = np.where(u > uts, 1 - rng.uniform(0.15, 0.3) * ((u - uts) / (1 - uts)) ** 2, 1)
+    force = peak_force * hardening * necking
+    force[:preload] = rng.uniform(0.02, 0.3, 1) * np.arange(preload) / max(preload, 1)
+    force[fracture:] = 0.0
+    force += rng.normal(0, noise, n_rows)
+
+    strain = 7.5 * ductility * u
+    # After fracture the extensometer knife edges slip or stay put
+    strain[fracture:] = strain[fracture - 1] * rng.uniform(0.7, 1.0)
+    extensometer = strain + rng.normal(0, noise / 10, n_rows)
+
+    displacement_start = rng.choice([-20.0, -15.0, 1.0, 2.0, 4.0, 10.0])
+    displacement = displacement_start + 9 * ductility * np.minimum(u, 1) + rng.normal(0, noise / 20, n_rows)
+
+    return {'Time': time, 'ESH B Force': force, 'ESH B Displacement': displacement,
+            'extensometer': extensometer}
+
+
+def write_specimen_dat(path, curve, extensometer_plot='A', timestamp=None, swap_analog=False, rng=None):
+    """
+    Write a curve as an MTS793 specimen.dat file.
+
+    Args:
+        path (str): Output file.
+        curve (dict): Output of synthetic_curve().
+        extensometer_plot (str): 'A' puts the extensometer on Analog In 1, anything else on Analog In 2.
+        timestamp (datetime): Acquisition timestamp written in the header.
+        swap_analog (bool): Write 'Analog In 1' before 'Analog In 2'.
+        rng (np.random.Generator): Random generator for the idle analog channel.
+    """
+    rng = rng or np.random.default_rng()
+    timestamp = timestamp or datetime.now()
+    n_rows = len(curve['Time'])
+    idle = rng.normal(0, 0.005, n_rows) + rng.uniform(-0.2, 1.0)
+    analog_1, analog_2 = (curve['extensometer'], idle) if extensometer_plot == 'A' else (idle, curve['extensometer'])
+
+    columns = ['Time', 'ESH B Force', 'ESH B Displacement', 'Analog In 2', 'Analog In 1']
+    data = [curve['Time'], curve['ESH B Force'], curve['ESH B Displacement'], analog_2, analog_1]
+    if swap_analog:
+        columns[3:], data[3:] = columns[:2:-1], data[:2:-1]
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='latin-1') as f:
+        f.write(MTS793_PREAMBLE + '\n\n')
+        f.write('Data Acquisition\t\t\t\t\t\tTime:\t' + f"{curve['Time'][-1]:.8g}" + '\ts\t'
+                + timestamp.strftime(TFD_new.MTS793_TIMESTAMP_FORMAT).replace(' 0', ' ').lstrip('0') + '\n')
+        f.write('\t'.join(columns) + '\n')
+        f.write('s\tkN\tmm\tV\tV\n')
+        np.savetxt(f, np.column_stack(data), fmt='%.8g', delimiter='\t')
+
+
+def generate_campaign(output_dir, n_specimens=100, n_rows=60000, noise=0.01, notch_type='SYN',
+                      swap_fraction=0.5, seed=0, manifest_name=None):
+    """
+    Generate a synthetic test campaign.
+
+    Args:
+        output_dir (str): Home directory of the campaign (plays the role of WP1_TENSILE).
+        n_specimens (int): Number of specimens.
+        n_rows (int): Rows per specimen.dat. Each specimen varies it by +-20%.
+        noise (float): Standard deviation of the force noise [kN].
+        notch_type (str): notch_type column of the manifest.
+        swap_fraction (float): Fraction of files with 'Analog In 1' before 'Analog In 2'.
+        seed (int): Random seed; the same arguments give the same files.
+        manifest_name (str): Manifest file name, default InputGraphs<notch_type>.xlsx.
+
+    Returns:
+        str: Path of the manifest.
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime(2021, 12, 20, 13, 28, 43)
+    rows = []
+    for i in range(n_specimens):
+        condition_type = CONDITIONS[i % len(CONDITIONS)]
+        specimen_name = f"SYN{i:05d}"
+        extensometer_plot = 'A' if rng.random() < 0.8 else '-'
+        # Hydrogen charged specimens fracture earlier
+        ductility = rng.uniform(0.8, 1.0) if condition_type == 'AIR' else rng.uniform(0.3, 0.8)
+        curve = synthetic_curve(int(n_rows * rng.uniform(0.8, 1.2)), rng, peak_force=rng.uniform(17, 30),
+                                noise=noise, ductility=ductility)
+        write_specimen_dat(TFD_new.specimen_data_file(output_dir, condition_type, specimen_name), curve,
+                           extensometer_plot, start + timedelta(hours=2 * i), rng.random() < swap_fraction, rng)
+        rows.append({'specimen_name': specimen_name, 'material_type': MATERIALS[i % len(MATERIALS)],
+                     'notch_type': notch_type, 'condition_type': condition_type,
+                     'extensometer_plot': extensometer_plot, 'Tested': 'YES', 'Invalid? ': None})
+        if (i + 1) % 100 == 0:
+            print(f"{i + 1}/{n_specimens} specimens written")
+
+    manifest = os.path.join(output_dir, manifest_name or f"InputGraphs{notch_type}.xlsx")
+    TFD_new.pd.DataFrame(rows).to_excel(manifest, index=False)
+    print('Manifest written to', manifest)
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Generate a synthetic MTS793 test campaign.')
+    parser.add_argument('output_dir', help='home directory of the generated campaign')
+    parser.add_argument('--specimens', type=int, default=100, help='number of specimens (default: %(default)s)')
+    parser.add_argument('--rows', type=float, default=60000, help='rows per specimen (default: %(default)s)')
+    parser.add_argument('--noise', type=float, default=0.01, help='force noise [kN] (default: %(default)s)')
+    parser.add_argument('--notch-type', default='SYN', help='notch_type in the manifest (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    generate_campaign(args.output_dir, args.specimens, int(args.rows), args.noise, args.notch_type,
+                      seed=args.seed)
+
+
+if __name__ == "__main__":
+    main()
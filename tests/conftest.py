@@ -0,0 +1,73 @@
+import os
+import sys
+
+import pytest
+
+# The modules are flat scripts in the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import TFD_new  # noqa: E402
+
+
+@pytest.fixture(scope='session', autouse=True)
+def module_cache(tmp_path_factory):
+    """Module level data and manifest caches under the test session directory instead of ./.tfd_cache."""
+    data_cache, cache_dir = TFD_new.data_cache, TFD_new.CACHE_DIR
+    TFD_new.CACHE_DIR = str(tmp_path_factory.mktemp('tfd_cache'))
+    TFD_new.data_cache = TFD_new.DataCache(TFD_new.CACHE_DIR)
+    yield TFD_new.data_cache
+    TFD_new.data_cache, TFD_new.CACHE_DIR = data_cache, cache_dir
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return TFD_new.DataCache(str(tmp_path / 'cache'))
+
+
+@pytest.fixture(scope='session')
+def home_dir(tmp_path_factory):
+    """One synthetic specimen, AIR/MTS/SYN1/specimen.dat, with the extensometer on Analog In 1."""
+    import numpy as np
+    import generate_synthetic_TFD
+    home_dir = str(tmp_path_factory.mktemp('home'))
+    rng = np.random.default_rng(7)
+    curve = generate_synthetic_TFD.synthetic_curve(8000, rng)
+    generate_synthetic_TFD.write_specimen_dat(TFD_new.specimen_data_file(home_dir, 'AIR', 'SYN1'), curve, 'A',
+                                              rng=rng)
+    return home_dir
+
+
+@pytest.fixture
+def processed_specimens(home_dir):
+    """
+    Factory of specimens run through specimen_pipeline() without memoization:
+    processed_specimens(compact=False, home_dir=<home_dir fixture>, specimen_name='SYN1').
+    """
+    default_home_dir = home_dir
+
+    def processed(compact=False, home_dir=default_home_dir, specimen_name='SYN1'):
+        args_dict = {'home_dir': home_dir, 'material_type': 'M', 'condition_type': 'AIR', 'notch_type': 'SYN',
+                     'specimen_name': specimen_name, 'extensometer_plot': 'A'}
+        return TFD_new.specimen_pipeline(args_dict, compact=compact, memo=False)
+    return processed
+
+
+@pytest.fixture(scope='session')
+def campaign(tmp_path_factory):
+    """Six synthetic specimens and their manifest: (home_dir, manifest path)."""
+    import generate_synthetic_TFD
+    home_dir = str(tmp_path_factory.mktemp('campaign'))
+    manifest = generate_synthetic_TFD.generate_campaign(home_dir, n_specimens=6, n_rows=6000, seed=3)
+    return home_dir, manifest
+
+
+@pytest.fixture
+def profiling():
+    """Profiler enabled for the test, restored afterwards."""
+    enabled, trace_memory = TFD_new.profiler.enabled, TFD_new.profiler.trace_memory
+    TFD_new.profiler.configure(enabled=True)
+    TFD_new.profiler.clear()
+    yield TFD_new.profiler
+    TFD_new.profiler.configure(enabled, trace_memory)
+    TFD_new.profiler.clear()
@@ -0,0 +1,30 @@
+import json
+
+import benchmark_TFD
+
+
+def results(**seconds):
+    return {key: benchmark_TFD.result(value, value, 1e6, 1000) for key, value in seconds.items()}
+
+
+def test_report_flags_slowdowns_above_the_threshold(capsys):
+    baseline = results(read=1.0, clip=1.0, smooth=1.0)
+    current = results(read=1.1, clip=1.3, smooth=0.5, plot=9.0)
+    assert benchmark_TFD.report(current, baseline, threshold=0.2) == ['clip']
+    assert benchmark_TFD.report(current, baseline, threshold=0.05) == ['read', 'clip']
+    # Without a baseline nothing is compared
+    assert benchmark_TFD.report(current) == []
+    assert 'x1.30 !' in capsys.readouterr().out
+
+
+def test_main_exits_nonzero_on_regression(tmp_path, monkeypatch):
+    monkeypatch.setattr(benchmark_TFD, 'run_suite', lambda home_dir, sizes, work_dir, repeat: results(read=1.0))
+    output = str(tmp_path / 'baseline.json')
+    assert benchmark_TFD.main(['--sizes', '--output', output]) == 0
+    with open(output) as f:
+        saved = json.load(f)
+    assert saved['results']['read']['seconds'] == 1.0 and 'numpy' in saved['meta']
+
+    monkeypatch.setattr(benchmark_TFD, 'run_suite', lambda home_dir, sizes, work_dir, repeat: results(read=1.5))
+    assert benchmark_TFD.main(['--sizes', '--baseline', output]) == 1
+    assert benchmark_TFD.main(['--sizes', '--baseline', output, '--threshold', '0.6']) == 0
@@ -0,0 +1,106 @@
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import TFD_new
+import generate_synthetic_TFD
+
+
+def reference_curve(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.cumsum(rng.uniform(0.005, 0.015, n))
+    return time, {'force': rng.normal(10, 1, n), 'elongation': np.linspace(0, 3, n)}
+
+
+@pytest.mark.parametrize('method, direction', [('previous', 'backward'), ('nearest', 'nearest')])
+@pytest.mark.parametrize('tolerance', [None, 0.004])
+def test_align_asof_matches_merge_asof(method, direction, tolerance):
+    reference_time, columns = reference_curve()
+    rng = np.random.default_rng(1)
+    # Frames inside the record only: outside it align_asof also limits the match to one sample interval
+    times = np.sort(rng.uniform(reference_time[0], reference_time[-1], 300))
+    aligned = TFD_new.align_asof(times, reference_time, columns, method, tolerance)
+
+    merged = pd.merge_asof(pd.DataFrame({'time': times}),
+                           pd.DataFrame({'time': reference_time, 'index': np.arange(len(reference_time)),
+                                         **columns}),
+                           on='time', direction=direction, tolerance=tolerance)
+    np.testing.assert_array_equal(aligned['index'], merged['index'].fillna(-1).to_numpy(dtype=np.int64))
+    for name in columns:
+        np.testing.assert_array_equal(aligned[name], merged[name].to_numpy())
+
+
+def test_align_asof_interp_and_out_of_range():
+    reference_time, columns = reference_curve()
+    times = np.array([reference_time[0] - 1, reference_time[0], reference_time[100] + 1e-4, reference_time[-1] + 1])
+    aligned = TFD_new.align_asof(times, reference_time, columns, 'interp')
+    expected = np.interp(times, reference_time, columns['force'], left=np.nan, right=np.nan)
+    np.testing.assert_array_equal(aligned['force'], expected)
+    nearest = TFD_new.align_asof(times, reference_time, columns, 'nearest')
+    assert list(nearest['index']) == [-1, 0, 100, -1]
+    with pytest.raises(ValueError):
+        TFD_new.align_asof(times, reference_time, columns, 'spline')
+
+
+
+@pytest.mark.parametrize('method', ['previous', 'nearest', 'interp'])
+def test_align_asof_empty_reference(method):
+    aligned = TFD_new.align_asof([1.0, 2.0], np.array([]), {'force': np.array([])}, method)
+    assert np.isnan(aligned['force']).all() and np.isnan(aligned['lag']).all()
+    assert list(aligned['index']) == [-1, -1]
+
+
+def write_camera_dat(path, frames, start):
+    """DAQ_camera.dat: one header block (the preamble on the first only) per camera frame."""
+    with open(path, 'w', encoding='latin-1') as f:
+        f.write(generate_synthetic_TFD.MTS793_PREAMBLE + '\n')
+        for i, (time, force) in enumerate(frames):
+            stamp = (start + timedelta(seconds=time)).strftime(TFD_new.MTS793_TIMESTAMP_FORMAT)
+            f.write('\n' if i == 0 else '\n\n')
+            f.write(f'Data Acquisition\t\t\t\t\t\tTime:\t{time:.6f}\ts\t{stamp}\n')
+            f.write('Time\tESH B Force\ns\tkN\n')
+            f.write(f'{time:.6f}\t{force:.6f}')
+        f.write('\n')
+
+
+def test_read_mts793_blocks_skips_blank_lines(tmp_path):
+    path = str(tmp_path / 'DAQ_camera.dat')
+    frames = [(1.5, 2.0), (2.5, -0.25), (3.5, 4.0)]
+    write_camera_dat(path, frames, datetime(2021, 12, 20, 13, 28, 43))
+    with open(path, 'a', encoding='latin-1') as f:
+        f.write('\n\n')
+    columns, metadata = TFD_new.read_mts793_blocks(path)
+    np.testing.assert_array_equal(columns['Time'], [1.5, 2.5, 3.5])
+    np.testing.assert_array_equal(columns['ESH B Force'], [2.0, -0.25, 4.0])
+    np.testing.assert_array_equal(metadata['block_times'], [1.5, 2.5, 3.5])
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_camera_frames_match_the_curve(processed_specimens, tmp_path, compact):
+    rng = np.random.default_rng(5)
+    curve = generate_synthetic_TFD.synthetic_curve(5000, rng)
+    home_dir = str(tmp_path)
+    generate_synthetic_TFD.write_specimen_dat(TFD_new.specimen_data_file(home_dir, 'AIR', 'CAM1'), curve, 'A',
+                                              rng=rng)
+    start = datetime(2021, 12, 20, 13, 28, 43)
+    frame_times = np.linspace(1, curve['Time'][-1] * 0.5, 40)
+    write_camera_dat(TFD_new.camera_data_file(home_dir, 'AIR', 'CAM1'),
+                     [(t, 5.0) for t in frame_times], start)
+
+    specimen = processed_specimens(compact, home_dir, 'CAM1')
+    table = TFD_new.camera_frames(specimen)
+
+    assert len(table) == len(frame_times)
+    np.testing.assert_allclose(table['time'], frame_times, atol=1e-6)
+    assert table['timestamp'].iloc[0] == start + timedelta(seconds=1)
+    force, elongation = TFD_new.clipped_curve(specimen, smoothed=False)
+    np.testing.assert_array_equal(table['force'], force[table['index']])
+    np.testing.assert_array_equal(table['elongation'], elongation[table['index']])
+    assert np.all(np.abs(table['lag']) <= np.max(np.diff(curve['Time'])))
+
+
+def test_camera_frames_table_skips_missing_files(processed_specimens):
+    table = TFD_new.camera_frames_table([processed_specimens()])
+    assert table.empty and list(table.columns) == TFD_new.KEY_COLUMNS
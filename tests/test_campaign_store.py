@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import TFD_new
+
+pytest.importorskip('h5py')
+
+
+@pytest.mark.parametrize('compact', [False, True])
+def test_round_trip(processed_specimens, tmp_path, compact):
+    specimen = processed_specimens(compact)
+    path = str(tmp_path / 'campaign.h5')
+    with TFD_new.CampaignStore(path, 'w') as store:
+        assert store.write_all([specimen]) == ['AIR/SYN1']
+    with TFD_new.CampaignStore(path, 'r') as store:
+        assert store.keys(condition_type='AIR') == ['AIR/SYN1']
+        assert store.keys(condition_type='H2_HC1') == []
+        curve = store.read('AIR/SYN1')
+        force, elongation = TFD_new.clipped_curve(specimen, smoothed=False)
+        np.testing.assert_array_equal(curve['force'], force)
+        np.testing.assert_allclose(curve['extensometer'], elongation, atol=1e-12)
+        np.testing.assert_array_equal(curve['smoothed_load'], TFD_new.clipped_curve(specimen)[0])
+
+        window = store.read('AIR/SYN1', ('time',), time_range=(10, 20))['time']
+        assert window[0] >= 10 and window[-1] <= 20
+        time = curve['time']
+        assert len(window) == np.count_nonzero((time >= 10) & (time <= 20))
+
+
+def test_write_all_accepts_a_generator(processed_specimens, tmp_path, profiling):
+    specimens = [processed_specimens()]
+    path = str(tmp_path / 'campaign.h5')
+    with TFD_new.CampaignStore(path, 'w') as store:
+        assert store.write_all(specimen for specimen in specimens) == ['AIR/SYN1']
+    with TFD_new.CampaignStore(path, 'r') as store:
+        assert store.keys() == ['AIR/SYN1']
+    event = [event for event in profiling.events if event['stage'] == 'write_all'][-1]
+    assert event['rows_out'] == TFD_new.clipped_rows(specimens[0])
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+
+import TFD_new
+
+
+def test_compact_matches_specimen(processed_specimens):
+    specimen, compact = processed_specimens(), processed_specimens(compact=True)
+    frame = compact.to_dataframe()
+    for name in ('Time', 'ESH B Force', 'Analog In 1', 'Smoothed load'):
+        np.testing.assert_array_equal(frame[name].to_numpy(), specimen.clipped_df[name].to_numpy())
+    assert compact.test_duration_sec == specimen.test_duration_sec
+
+
+def test_plots_read_compact_arrays_directly(processed_specimens, tmp_path, monkeypatch):
+    specimen, compact = processed_specimens(), processed_specimens(compact=True)
+    expected = TFD_new.curve_figure([specimen], 500)
+
+    def no_frame(self):
+        raise AssertionError('DataFrame built for plotting')
+    monkeypatch.setattr(TFD_new.CompactSpecimen, 'clipped_df', property(no_frame))
+    figure = TFD_new.curve_figure([compact], 500)
+    np.testing.assert_array_equal(figure.data[0].x, expected.data[0].x)
+    np.testing.assert_array_equal(figure.data[0].y, expected.data[0].y)
+    TFD_new.plot_lod_report([compact], str(tmp_path / 'report'), base_points=200)
+    TFD_new.sav_gol_sweep([compact], [51])
+
+
+@pytest.mark.parametrize('flag', ['--compact', '--streaming'])
+def test_compact_and_streaming_need_the_smooth_stage(flag):
+    with pytest.raises(SystemExit):
+        TFD_new.parse_args([flag, '--stages', 'read', 'clip', 'zero'])
+    assert getattr(TFD_new.parse_args([flag]), flag[2:])
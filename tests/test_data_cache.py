@@ -0,0 +1,81 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+
+import TFD_new
+
+
+def _columns(i, n=1000):
+    return {'Time': np.arange(n, dtype=np.float64) + i, 'ESH B Force': np.full(n, float(i))}
+
+
+def _put(args):
+    cache_dir, i = args
+    cache = TFD_new.DataCache(cache_dir)
+    cache.put_derived(f"{i:032x}", ['Time', 'ESH B Force'], _columns(i), {'i': i})
+
+
+def _npy_files(cache):
+    return sorted(name for name in os.listdir(cache.cache_dir) if name.endswith('.npy'))
+
+
+def test_put_get_round_trip(cache, tmp_path):
+    source = tmp_path / 'specimen.dat'
+    source.write_text('data')
+    metadata = {'timestamp': datetime(2021, 12, 20, 13, 28, 43), 'units': {'Time': 's'}}
+    assert cache.get(str(source), ['Time', 'ESH B Force'], np.float64) is None
+    cache.put(str(source), ['Time', 'ESH B Force'], np.float64, _columns(3), metadata)
+
+    columns, got = cache.get(str(source), ['Time', 'ESH B Force'], np.float64)
+    np.testing.assert_array_equal(columns['Time'], _columns(3)['Time'])
+    assert got == metadata
+    # Another dtype or a changed file is another entry
+    assert cache.get(str(source), ['Time', 'ESH B Force'], np.float32) is None
+    source.write_text('changed data')
+    assert cache.get(str(source), ['Time', 'ESH B Force'], np.float64) is None
+
+
+def test_concurrent_processes_keep_every_entry(cache):
+    with ProcessPoolExecutor(max_workers=8) as pool:
+        list(pool.map(_put, [(cache.cache_dir, i) for i in range(16)]))
+    assert len(_npy_files(cache)) == 16
+    for i in range(16):
+        columns, metadata = cache.get_derived(f"{i:032x}", ['Time', 'ESH B Force'])
+        assert metadata == {'i': i}
+        np.testing.assert_array_equal(columns['ESH B Force'], _columns(i)['ESH B Force'])
+
+
+def test_hit_only_touches_the_entry(cache):
+    _put((cache.cache_dir, 1))
+    before = {name: os.stat(os.path.join(cache.cache_dir, name)).st_mtime_ns
+              for name in os.listdir(cache.cache_dir)}
+    os.utime(os.path.join(cache.cache_dir, f"{1:032x}.npy"), ns=(0, 0))
+    assert cache.get_derived(f"{1:032x}", ['Time', 'ESH B Force']) is not None
+    after = {name: os.stat(os.path.join(cache.cache_dir, name)).st_mtime_ns
+             for name in os.listdir(cache.cache_dir)}
+    assert after[f"{1:032x}.json"] == before[f"{1:032x}.json"]
+    assert after[f"{1:032x}.npy"] > 0
+
+
+def test_eviction_drops_least_recently_used(tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    for i in range(3):
+        _put((cache_dir, i))
+        os.utime(os.path.join(cache_dir, f"{i:032x}.npy"), ns=(i * 10**9, i * 10**9))
+    # Room for three .npy files
+    cache = TFD_new.DataCache(cache_dir, max_bytes=3 * os.path.getsize(os.path.join(cache_dir, f"{0:032x}.npy")))
+    # Entry 0 is used again, so entry 1 is now the oldest
+    os.utime(os.path.join(cache.cache_dir, f"{0:032x}.npy"), ns=(10 * 10**9, 10 * 10**9))
+    cache.put_derived(f"{3:032x}", ['Time', 'ESH B Force'], _columns(3), {})
+    assert cache.get_derived(f"{1:032x}", ['Time']) is None
+    assert {name[:-4] for name in _npy_files(cache)} == {f"{i:032x}" for i in (0, 2, 3)}
+    assert not os.path.exists(os.path.join(cache.cache_dir, f"{1:032x}.json"))
+
+
+def test_clear(cache):
+    _put((cache.cache_dir, 1))
+    cache.clear()
+    assert _npy_files(cache) == []
+    assert cache.get_derived(f"{1:032x}", ['Time']) is None
@@ -0,0 +1,57 @@
+import numpy as np
+
+import TFD_new
+
+
+def _specimen(home_dir, compact=False, dtype=np.float64):
+    if compact:
+        specimen = TFD_new.CompactSpecimen(home_dir, 'M', 'AIR', 'SYN', 'SYN1', 'A', dtype)
+        specimen.read_csv(cache=False, shared=False)
+    else:
+        specimen = TFD_new.Specimen(home_dir, 'M', 'AIR', 'SYN', 'SYN1', 'A')
+        specimen.read_csv(dtype=dtype, cache=False, shared=False)
+    return specimen
+
+
+def _state(specimen):
+    if isinstance(specimen, TFD_new.CompactSpecimen):
+        arrays = [specimen.clipped_time, specimen.clipped_force, specimen.clipped_extensometer,
+                  specimen.smoothed_load]
+    else:
+        arrays = [specimen.clipped_df[col].to_numpy() for col in specimen.clipped_df]
+    return arrays, (specimen.clip_start, specimen.clip_stop, specimen.test_duration_sec, specimen.test_duration_min)
+
+
+def test_key_follows_data_dtype(home_dir, cache):
+    memo = TFD_new.DerivedCache(cache)
+    keys = {(compact, dtype): memo.key(_specimen(home_dir, compact, dtype), window_size=181)
+            for compact in (False, True) for dtype in (np.float32, np.float64)}
+    assert keys[False, np.float32] != keys[False, np.float64]
+    # Specimen and CompactSpecimen of the same data and dtype share entries
+    assert keys[False, np.float32] == keys[True, np.float32]
+    assert keys[False, np.float64] == keys[True, np.float64]
+
+
+def test_hits_reproduce_computed_state(home_dir, cache):
+    for compact in (False, True):
+        memo = TFD_new.DerivedCache(TFD_new.DataCache(f"{cache.cache_dir}_{compact}"))
+        reference = TFD_new.derive_specimen(_specimen(home_dir, compact), memo=False)
+        miss = TFD_new.derive_specimen(_specimen(home_dir, compact), memo=memo)
+        memory_hit = TFD_new.derive_specimen(_specimen(home_dir, compact), memo=memo)
+        memo.clear()
+        disk_hit = TFD_new.derive_specimen(_specimen(home_dir, compact), memo=memo)
+        assert memo.hits == 2 and memo.misses == 1
+        for specimen in (miss, memory_hit, disk_hit):
+            arrays, scalars = _state(specimen)
+            expected_arrays, expected_scalars = _state(reference)
+            assert scalars == expected_scalars
+            for got, expected in zip(arrays, expected_arrays):
+                np.testing.assert_array_equal(got, expected)
+
+
+def test_parameters_are_part_of_the_key(home_dir, cache):
+    memo = TFD_new.DerivedCache(cache)
+    TFD_new.derive_specimen(_specimen(home_dir), window_size=181, memo=memo)
+    TFD_new.derive_specimen(_specimen(home_dir), window_size=101, memo=memo)
+    TFD_new.derive_specimen(_specimen(home_dir), clip_value=2, memo=memo)
+    assert memo.misses == 3 and memo.hits == 0
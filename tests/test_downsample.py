@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+import TFD_new
+
+
+def lttb_reference(x, y, n_out):
+    """Point-by-point LTTB as published by Steinarsson (2013)."""
+    n = len(x)
+    every = (n - 2) / (n_out - 2)
+    selected = [0]
+    a = 0
+    for i in range(n_out - 2):
+        start = int(np.floor((i + 1) * every)) + 1
+        stop = min(int(np.floor((i + 2) * every)) + 1, n)
+        avg_x, avg_y = np.mean(x[start:stop]), np.mean(y[start:stop])
+        lo, hi = int(np.floor(i * every)) + 1, int(np.floor((i + 1) * every)) + 1
+        best, best_area = lo, -1.0
+        for j in range(lo, hi):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return np.array(selected)
+
+
+def tensile_curve(n, seed=0):
+    rng = np.random.default_rng(seed)
+    x = np.linspace(0, 10, n)
+    y = 20 * np.tanh(x) * np.exp(-0.02 * x ** 2) + rng.normal(0, 0.2, n)
+    return x, y
+
+
+@pytest.mark.parametrize('n, n_out', [(1000, 100), (9999, 500), (20000, 2000)])
+def test_lttb_matches_reference(n, n_out):
+    x, y = tensile_curve(n)
+    keep = TFD_new.lttb_downsample(x, y, n_out)
+    # lttb_downsample adds the maximum load if LTTB dropped it
+    expected = np.union1d(lttb_reference(x, y, n_out), [np.argmax(y)])
+    np.testing.assert_array_equal(keep, expected)
+
+
+@pytest.mark.parametrize('method', ['lttb', 'minmax'])
+def test_downsample_keeps_end_points_and_maximum(method):
+    x, y = tensile_curve(50000, seed=3)
+    y[31234] = 40.0
+    dx, dy = TFD_new.downsample_curve(x, y, 2000, method)
+    assert len(dx) <= 2002
+    assert dx[0] == x[0] and dx[-1] == x[-1]
+    assert dy.max() == y.max()
+    assert np.all(np.diff(dx) > 0)
+
+
+def test_minmax_keeps_every_bucket_extreme():
+    x, y = tensile_curve(10000, seed=5)
+    keep = TFD_new.minmax_downsample(x, y, 200)
+    buckets = np.array_split(np.arange(len(y)), 100)
+    for bucket in buckets:
+        assert bucket[np.argmin(y[bucket])] in keep
+        assert bucket[np.argmax(y[bucket])] in keep
+
+
+def test_downsample_short_curves_and_bad_method():
+    x, y = tensile_curve(100)
+    dx, dy = TFD_new.downsample_curve(x, y, 2000)
+    assert len(dx) == 100
+    dx, dy = TFD_new.downsample_curve(x, y, None)
+    assert len(dx) == 100
+    with pytest.raises(ValueError):
+        TFD_new.downsample_curve(*tensile_curve(5000), 100, 'random')
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import TFD_new
+
+
+def interp_reference(force, extensometer, grid):
+    x = np.maximum.accumulate(extensometer)
+    return np.interp(grid, x, force, left=np.nan, right=np.nan)
+
+
+def noisy_curves(n_curves=7, seed=0):
+    rng = np.random.default_rng(seed)
+    forces, extensometers = [], []
+    for k in range(n_curves):
+        n = int(rng.integers(50, 3000))
+        x = np.linspace(rng.uniform(-0.1, 0.2), rng.uniform(2, 6), n) + rng.normal(0, 0.01, n)
+        forces.append(20 * np.tanh(x) + rng.normal(0, 0.2, n))
+        extensometers.append(x)
+    return forces, extensometers
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_resample_curves_matches_interp(seed):
+    forces, extensometers = noisy_curves(seed=seed)
+    grid = np.sort(np.random.default_rng(seed + 10).uniform(-0.5, 6.5, 400))
+    resampled = TFD_new.resample_curves(forces, extensometers, grid)
+    assert resampled.shape == (len(forces), len(grid))
+    for row, force, extensometer in zip(resampled, forces, extensometers):
+        np.testing.assert_allclose(row, interp_reference(force, extensometer, grid), rtol=1e-9, atol=1e-9)
+
+
+def test_resample_curves_rejects_single_points():
+    assert TFD_new.resample_curves([], [], np.linspace(0, 1, 5)).shape == (0, 5)
+    with pytest.raises(ValueError):
+        TFD_new.resample_curves([np.ones(1)], [np.ones(1)], np.linspace(0, 1, 5))
+
+
+def test_ensemble_stats_match_groupby(campaign):
+    home_dir, manifest = campaign
+    specimens = TFD_new.process_specimens_parallel(TFD_new.load_manifests([manifest]), home_dir,
+                                                   executor='serial', memo=False)[0]
+    stats = TFD_new.ensemble_stats(specimens, n_points=200)
+
+    curves = pd.DataFrame(stats['curves'])
+    keys = pd.DataFrame({col: [getattr(s, col) for s in specimens] for col in TFD_new.ENSEMBLE_GROUP_COLUMNS})
+    grouped = curves.groupby([keys[col] for col in TFD_new.ENSEMBLE_GROUP_COLUMNS], sort=False)
+    assert len(stats['groups']) == grouped.ngroups
+    for i, group in stats['groups'].iterrows():
+        rows = grouped.get_group(tuple(group))
+        np.testing.assert_allclose(stats['mean'][i], rows.mean().to_numpy(), rtol=1e-9, atol=1e-9)
+        np.testing.assert_allclose(stats['std'][i], rows.std(ddof=1).to_numpy(), rtol=1e-6, atol=1e-6)
+        np.testing.assert_array_equal(stats['count'][i], rows.count().to_numpy())
@@ -0,0 +1,73 @@
+import importlib.util
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import TFD_new
+
+
+class StubFigure:
+    def __init__(self, name):
+        self.name = name
+
+    def write_html(self, path, include_plotlyjs=True):
+        with open(path, 'w') as f:
+            f.write(self.name)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    """Replace plotly.io by a stub recording the write_images() batches."""
+    calls = []
+
+    def write_images(figs, paths, scale=1):
+        calls.append(([fig.name for fig in figs], list(paths), scale))
+    monkeypatch.setattr(TFD_new, 'pio', SimpleNamespace(write_images=write_images))
+    return calls
+
+
+def test_static_figures_exported_in_one_batch(calls, tmp_path):
+    output_dir = str(tmp_path / 'figures')
+    exporter = TFD_new.FigureExporter(output_dir, formats=('png', 'html'), scale=2)
+    exporter.add(StubFigure('a'), 'SRB')
+    exporter.add(StubFigure('b'), 'R2', formats=('svg', 'pdf'))
+    written = exporter.export()
+
+    expected = [os.path.join(output_dir, name) for name in ('SRB.png', 'SRB.html', 'R2.svg', 'R2.pdf')]
+    assert written == expected
+    assert calls == [(['a', 'b', 'b'], [expected[0], expected[2], expected[3]], 2)]
+    with open(expected[1]) as f:
+        assert f.read() == 'a'
+    assert exporter.queue == []
+    assert exporter.export() == [] and len(calls) == 1
+
+
+def test_static_figures_one_by_one_without_write_images(monkeypatch, tmp_path):
+    calls = []
+    monkeypatch.setattr(TFD_new, 'pio', SimpleNamespace(
+        write_image=lambda fig, path, scale=1: calls.append((fig.name, os.path.basename(path)))))
+    exporter = TFD_new.FigureExporter(str(tmp_path), formats=('png', 'jpeg'))
+    exporter.add(StubFigure('a'), 'SRB')
+    exporter.export()
+    assert calls == [('a', 'SRB.png'), ('a', 'SRB.jpeg')]
+
+
+def test_unknown_format_rejected(calls, tmp_path):
+    with pytest.raises(ValueError):
+        TFD_new.FigureExporter(str(tmp_path), formats=('png', 'gif'))
+    exporter = TFD_new.FigureExporter(str(tmp_path))
+    with pytest.raises(ValueError):
+        exporter.add(StubFigure('a'), 'SRB', formats=('tiff',))
+
+
+def test_missing_kaleido_fails_up_front(monkeypatch, tmp_path):
+    find_spec = importlib.util.find_spec
+    monkeypatch.setattr(importlib.util, 'find_spec', lambda name, *args: None if name == 'kaleido'
+                        else find_spec(name, *args))
+    with pytest.raises(RuntimeError, match='kaleido'):
+        TFD_new.FigureExporter(str(tmp_path), formats=('html', 'png'))
+    with pytest.raises(RuntimeError, match='kaleido'):
+        TFD_new.IncrementalRunner([], str(tmp_path), state_file=str(tmp_path / 'state.json'), formats=('svg',))
+    # HTML needs no renderer
+    TFD_new.FigureExporter(str(tmp_path), formats=('html',))
@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pytest
+
+import TFD_new
+import generate_synthetic_TFD
+
+
+@pytest.mark.parametrize('extensometer_plot, swap_analog', [('A', False), ('-', True)])
+def test_specimen_dat_round_trip(tmp_path, extensometer_plot, swap_analog):
+    rng = np.random.default_rng(2)
+    curve = generate_synthetic_TFD.synthetic_curve(3000, rng)
+    path = str(tmp_path / 'specimen.dat')
+    generate_synthetic_TFD.write_specimen_dat(path, curve, extensometer_plot, swap_analog=swap_analog, rng=rng)
+
+    columns, metadata = TFD_new.read_mts793(path)
+    channel = 'Analog In 1' if extensometer_plot == 'A' else 'Analog In 2'
+    assert metadata['units']['ESH B Force'] == 'kN' and metadata['timestamp'] is not None
+    assert metadata['columns'].index('Analog In 1') < metadata['columns'].index('Analog In 2') if swap_analog else \
+        metadata['columns'].index('Analog In 2') < metadata['columns'].index('Analog In 1')
+    # Written with 8 significant digits
+    np.testing.assert_allclose(columns['Time'], curve['Time'], rtol=1e-7)
+    np.testing.assert_allclose(columns['ESH B Force'], curve['ESH B Force'], rtol=1e-7, atol=1e-12)
+    np.testing.assert_allclose(columns[channel], curve['extensometer'], rtol=1e-7, atol=1e-12)
+
+
+def test_campaign_is_reproducible(tmp_path):
+    manifests = [generate_synthetic_TFD.generate_campaign(str(tmp_path / name), n_specimens=3, n_rows=2000, seed=4)
+                 for name in ('a', 'b')]
+    first, second = TFD_new.load_manifests(manifests)
+    assert first[TFD_new.MANIFEST_COLUMNS].equals(second[TFD_new.MANIFEST_COLUMNS])
+    for _, row in first.iterrows():
+        paths = [TFD_new.specimen_data_file(str(tmp_path / name), row['condition_type'], row['specimen_name'])
+                 for name in ('a', 'b')]
+        with open(paths[0], 'rb') as a, open(paths[1], 'rb') as b:
+            assert a.read() == b.read()
+
+
+def test_campaign_trace_is_valid_json(campaign, tmp_path, profiling):
+    home_dir, manifest = campaign
+    specimens_df = TFD_new.load_manifests([manifest])[0]
+    TFD_new.process_specimens_parallel([specimens_df], home_dir, executor='serial', memo=False)
+    path = str(tmp_path / 'trace.json')
+    profiling.write_chrome_trace(path)
+
+    with open(path) as f:
+        trace = json.load(f)
+    events = trace['traceEvents']
+    assert trace['displayTimeUnit'] == 'ms'
+    assert all(event['ph'] == 'X' and event['dur'] >= 0 for event in events)
+    names = {event['name'] for event in events}
+    assert {'read_csv', 'load_clip', 'zero_extensometer', 'sav_gol_smooth'} <= names
+    specimens = {event['args']['specimen'] for event in events if event['name'] == 'read_csv'}
+    assert specimens == set(specimens_df['specimen_name'])
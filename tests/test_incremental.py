@@ -0,0 +1,39 @@
+import os
+import shutil
+
+import TFD_new
+
+
+def test_incremental_passes_recompute_only_changes(campaign, tmp_path):
+    home_dir = str(tmp_path / 'home')
+    shutil.copytree(campaign[0], home_dir)
+    manifest = os.path.join(home_dir, os.path.basename(campaign[1]))
+    runner = TFD_new.IncrementalRunner([manifest], home_dir, state_file=str(tmp_path / 'state.json'),
+                                       output_dir=str(tmp_path / 'figures'), formats=('html',), executor='serial')
+
+    first = runner.run_once()
+    assert len(first['specimens']) == 6 and first['figures'] == [manifest] and first['missing'] == []
+    assert os.listdir(tmp_path / 'figures')
+
+    second = runner.run_once()
+    assert second == {'specimens': [], 'figures': [], 'missing': []}
+
+    # A rewritten specimen.dat is recomputed and its figure redrawn, the others are reused
+    key = first['specimens'][2]
+    path = key.split('|')[0]
+    with open(path, 'a') as f:
+        f.write('\n')
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    held = dict(runner.specimens)
+    third = runner.run_once()
+    assert third['specimens'] == [key] and third['figures'] == [manifest]
+    assert all(runner.specimens[k] is held[k] for k in held if k != key)
+
+    # A fresh runner on the same state file starts where the last one stopped
+    os.remove(path)
+    restarted = TFD_new.IncrementalRunner([manifest], home_dir, state_file=str(tmp_path / 'state.json'),
+                                          output_dir=str(tmp_path / 'figures'), formats=('html',),
+                                          executor='serial')
+    fourth = restarted.run_once()
+    assert fourth['specimens'] == [] and fourth['missing'] == [key]
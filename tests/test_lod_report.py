@@ -0,0 +1,20 @@
+import os
+
+import numpy as np
+
+import TFD_new
+
+
+def test_lod_pyramid_levels_keep_the_extremes():
+    x = np.linspace(0, 10, 20000)
+    y = np.sin(x) + np.where(np.arange(x.size) == 12345, 5.0, 0.0)
+    levels = TFD_new.lod_pyramid(x, y, 500, 4)
+    assert len(levels) > 1
+    for lx, ly in levels:
+        assert ly.max() == y.max()
+        assert lx[0] == x[0] and lx[-1] == x[-1]
+
+
+def test_report_creates_the_output_directory(processed_specimens, tmp_path):
+    path = TFD_new.plot_lod_report([processed_specimens()], str(tmp_path / 'figures' / 'new' / 'report'), base_points=200)
+    assert os.path.isfile(path)
@@ -0,0 +1,103 @@
+import os
+
+import pandas as pd
+import pytest
+
+import TFD_new
+
+ROWS = [
+    {'specimen_name': 'LyA1', 'material_type': 'M1', 'notch_type': 'SRB', 'condition_type': 'AIR',
+     'extensometer_plot': 'A', 'Tested': 'YES', 'Invalid? ': None},
+    {'specimen_name': 'LyA2', 'material_type': 'M1', 'notch_type': 'SRB', 'condition_type': 'AIR',
+     'extensometer_plot': 'A', 'Tested': 'YES', 'Invalid? ': 'YES'},
+    {'specimen_name': 'LyA3', 'material_type': 'M1', 'notch_type': 'SRB', 'condition_type': 'H2_HC1',
+     'extensometer_plot': '-', 'Tested': 'no', 'Invalid? ': None},
+    {'specimen_name': 'LyA4', 'material_type': 'M2', 'notch_type': 'R2', 'condition_type': 'H2_HC1',
+     'extensometer_plot': '-', 'Tested': 'YES', 'Invalid? ': 'N'},
+]
+
+
+@pytest.fixture
+def xlsx(tmp_path):
+    path = str(tmp_path / 'InputGraphsTEST.xlsx')
+    pd.DataFrame(ROWS).to_excel(path, index=False)
+    return path
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Paths parsed from the source file rather than a cache."""
+    calls = []
+    parse = TFD_new._parse_manifest
+
+    def counting_parse(path, sheet_name=0):
+        calls.append(path)
+        return parse(path, sheet_name)
+    monkeypatch.setattr(TFD_new, '_parse_manifest', counting_parse)
+    monkeypatch.setattr(TFD_new, '_manifest_cache', {})
+    return calls
+
+
+def test_cache_hits_in_memory_and_on_disk(xlsx, tmp_path, parses):
+    cache_dir = str(tmp_path / 'manifests')
+    first = TFD_new.read_manifest(xlsx, cache_dir=cache_dir)
+    first.loc[0, 'specimen_name'] = 'changed by the caller'
+    second = TFD_new.read_manifest(xlsx, cache_dir=cache_dir)
+    TFD_new._manifest_cache.clear()
+    third = TFD_new.read_manifest(xlsx, cache_dir=cache_dir)
+    assert parses == [xlsx]
+    assert len(os.listdir(cache_dir)) == 1
+    pd.testing.assert_frame_equal(second, third)
+    assert second.loc[0, 'specimen_name'] == 'LyA1'
+    assert 'Invalid?' in second.columns
+
+
+def test_modified_workbook_is_parsed_again(xlsx, tmp_path, parses):
+    cache_dir = str(tmp_path / 'manifests')
+    TFD_new.read_manifest(xlsx, cache_dir=cache_dir)
+    pd.DataFrame(ROWS[:2]).to_excel(xlsx, index=False)
+    stat = os.stat(xlsx)
+    os.utime(xlsx, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    assert len(TFD_new.read_manifest(xlsx, cache_dir=cache_dir)) == 2
+    assert parses == [xlsx, xlsx]
+
+
+def test_corrupt_pickle_is_parsed_again(xlsx, tmp_path, parses):
+    cache_dir = str(tmp_path / 'manifests')
+    TFD_new.read_manifest(xlsx, cache_dir=cache_dir)
+    pickle_file = os.path.join(cache_dir, os.listdir(cache_dir)[0])
+    with open(pickle_file, 'wb') as f:
+        f.write(b'\x80\x05not a pickle')
+    TFD_new._manifest_cache.clear()
+    assert len(TFD_new.read_manifest(xlsx, cache_dir=cache_dir)) == 4
+    assert parses == [xlsx, xlsx]
+
+
+def test_filter_manifest(xlsx):
+    manifest = TFD_new.filter_manifest(TFD_new.read_manifest(xlsx, cache_dir=''))
+    assert list(manifest['specimen_name']) == ['LyA1', 'LyA4']
+    assert list(manifest.index) == [0, 1]
+
+
+def test_csv_and_toml_manifests(xlsx, tmp_path, parses):
+    csv = str(tmp_path / 'manifest.csv')
+    pd.DataFrame(ROWS).to_csv(csv, index=False)
+    toml = str(tmp_path / 'manifest.toml')
+    with open(toml, 'w') as f:
+        for row in ROWS:
+            f.write('[[specimen]]\n')
+            f.write(''.join(f'"{key.strip()}" = "{value}"\n' for key, value in row.items() if value is not None))
+    cache_dir = str(tmp_path / 'manifests')
+    expected = TFD_new.filter_manifest(TFD_new.read_manifest(xlsx, cache_dir=''))[TFD_new.MANIFEST_COLUMNS]
+    for path in (csv, toml):
+        manifest = TFD_new.filter_manifest(TFD_new.read_manifest(path, cache_dir=cache_dir))
+        pd.testing.assert_frame_equal(manifest[TFD_new.MANIFEST_COLUMNS], expected)
+    # Text manifests are cheap to parse and never pickled
+    assert not os.path.exists(cache_dir)
+
+
+def test_missing_columns(tmp_path):
+    csv = str(tmp_path / 'manifest.csv')
+    pd.DataFrame([{'specimen_name': 'LyA1'}]).to_csv(csv, index=False)
+    with pytest.raises(ValueError, match='missing manifest columns'):
+        TFD_new.read_manifest(csv)
@@ -0,0 +1,152 @@
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import TFD_new
+
+
+def properties(specimens_sets):
+    return TFD_new.extract_properties([specimen for specimens in specimens_sets for specimen in specimens])
+
+
+@pytest.fixture(scope='module')
+def manifests(campaign):
+    home_dir, manifest = campaign
+    full = TFD_new.load_manifests([manifest])[0]
+    # Two overlapping manifests, as SRB/R2/R6 share specimens
+    return home_dir, [full.iloc[:4].reset_index(drop=True), full.iloc[2:].reset_index(drop=True)]
+
+
+@pytest.fixture(scope='module')
+def serial(manifests):
+    home_dir, specimens_dfs = manifests
+    return TFD_new.process_specimens_parallel(specimens_dfs, home_dir, executor='serial', memo=False)
+
+
+@pytest.mark.parametrize('executor', ['thread', 'process', 'pipeline'])
+@pytest.mark.parametrize('compact', [False, True])
+def test_parallel_properties_match_serial(manifests, serial, executor, compact):
+    home_dir, specimens_dfs = manifests
+    specimens_sets = TFD_new.process_specimens_parallel(specimens_dfs, home_dir, executor=executor, max_workers=3,
+                                                        compact=compact, memo=False)
+    assert [len(specimens) for specimens in specimens_sets] == [4, 4]
+    assert [[s.specimen_name for s in specimens] for specimens in specimens_sets] == \
+        [[s.specimen_name for s in specimens] for specimens in serial]
+    pd.testing.assert_frame_equal(properties(specimens_sets), properties(serial))
+
+
+def test_pipeline_reads_shared_specimens_once(manifests):
+    home_dir, specimens_dfs = manifests
+    first, second = TFD_new.process_specimens_pipelined(specimens_dfs, home_dir, readers=2, workers=2, memo=False)
+    assert first[2] is second[0] and first[3] is second[1]
+
+
+def test_pipeline_reports_every_manifest_once(manifests):
+    home_dir, specimens_dfs = manifests
+    seen = []
+    TFD_new.process_specimens_pipelined(specimens_dfs, home_dir, readers=3, workers=2, queue_size=1, memo=False,
+                                        on_manifest=lambda index, specimens: seen.append((index, len(specimens))))
+    assert sorted(seen) == [(0, 4), (1, 4)]
+
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'pipeline'])
+def test_missing_specimen_raises(manifests, executor):
+    home_dir, specimens_dfs = manifests
+    broken = specimens_dfs[0].copy()
+    broken.loc[1, 'specimen_name'] = 'NOSUCH'
+    with pytest.raises(FileNotFoundError):
+        TFD_new.process_specimens_parallel([broken], home_dir, executor=executor, max_workers=2, memo=False)
+
+
+@pytest.mark.parametrize('executor', ['serial', 'thread', 'pipeline'])
+def test_manifest_generator_input(manifests, serial, executor):
+    home_dir, specimens_dfs = manifests
+    specimens_sets = TFD_new.process_specimens_parallel((df for df in specimens_dfs), home_dir, executor=executor,
+                                                        max_workers=2, memo=False)
+    pd.testing.assert_frame_equal(properties(specimens_sets), properties(serial))
+
+
+
+# Pipeline threading, with read_specimen()/finish_specimen() replaced by stubs
+
+def stub_manifest(n):
+    return pd.DataFrame({col: [f"{col}{i}" if col == 'specimen_name' else 'X' for i in range(n)]
+                         for col in TFD_new.MANIFEST_COLUMNS})
+
+
+def pipeline_threads():
+    return [thread for thread in threading.enumerate() if thread.name.startswith('tfd-') and thread.is_alive()]
+
+
+def run_pipeline(timeout=10, **kwargs):
+    """Run process_specimens_pipelined() in a helper thread so a deadlock fails instead of hanging."""
+    outcome = {}
+
+    def target():
+        try:
+            outcome['result'] = TFD_new.process_specimens_pipelined(home_dir='.', memo=False, **kwargs)
+        except BaseException as exc:
+            outcome['error'] = exc
+    thread = threading.Thread(target=target)
+    start = time.perf_counter()
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), 'process_specimens_pipelined() deadlocked'
+    return outcome, time.perf_counter() - start
+
+
+def test_pipeline_backpressure_bounds_read_ahead(monkeypatch):
+    reads = []
+    lock = threading.Lock()
+    ahead = []
+
+    def read_specimen(args_dict, *args):
+        with lock:
+            reads.append(args_dict['specimen_name'])
+        return args_dict['specimen_name']
+
+    def finish_specimen(specimen, *args):
+        time.sleep(0.02)
+        with lock:
+            ahead.append(len(reads) - len(ahead))
+        return specimen
+    monkeypatch.setattr(TFD_new, 'read_specimen', read_specimen)
+    monkeypatch.setattr(TFD_new, 'finish_specimen', finish_specimen)
+
+    specimens_df = stub_manifest(30)
+    outcome, _ = run_pipeline(specimens_dfs=[specimens_df], readers=2, workers=1, queue_size=2)
+    assert outcome['result'] == [list(specimens_df['specimen_name'])]
+    # Read but not yet finished: the one being computed, queue_size queued and one blocked put per reader
+    assert max(ahead) <= 1 + 2 + 2
+    assert not pipeline_threads()
+
+
+@pytest.mark.parametrize('stage', ['read', 'compute', 'on_manifest'])
+def test_pipeline_stage_error_propagates(monkeypatch, stage):
+    def read_specimen(args_dict, *args):
+        if stage == 'read' and args_dict['specimen_name'] == 'specimen_name3':
+            raise OSError('unreadable')
+        return args_dict['specimen_name']
+
+    def finish_specimen(specimen, *args):
+        if stage == 'compute' and specimen == 'specimen_name3':
+            raise RuntimeError('bad curve')
+        time.sleep(0.01)
+        return specimen
+
+    def on_manifest(index, specimens):
+        if stage == 'on_manifest':
+            raise ValueError('figure failed')
+    monkeypatch.setattr(TFD_new, 'read_specimen', read_specimen)
+    monkeypatch.setattr(TFD_new, 'finish_specimen', finish_specimen)
+
+    specimens_dfs = [stub_manifest(4), stub_manifest(200)]
+    outcome, elapsed = run_pipeline(specimens_dfs=specimens_dfs, readers=3, workers=2, queue_size=1,
+                                    on_manifest=on_manifest)
+    expected = {'read': OSError, 'compute': RuntimeError, 'on_manifest': ValueError}[stage]
+    assert isinstance(outcome.get('error'), expected)
+    # Stopped early rather than after the 200 specimens of the second manifest (~1 s of compute)
+    assert elapsed < 0.5
+    assert not pipeline_threads()
@@ -0,0 +1,31 @@
+import argparse
+import json
+
+import TFD_new
+
+
+def test_profiler_is_off_by_default():
+    assert not TFD_new.Profiler().enabled
+    assert not TFD_new.profiler.enabled
+    assert TFD_new.profiler.events == []
+
+
+def test_watch_reports_and_clears_every_pass(tmp_path, monkeypatch, profiling):
+    runner = TFD_new.IncrementalRunner([], str(tmp_path), state_file=str(tmp_path / 'state.json'),
+                                       output_dir=str(tmp_path), formats=('html',))
+    args = argparse.Namespace(profile=str(tmp_path / 'profile.json'), trace=None)
+    passes = []
+
+    def sleep(interval):
+        passes.append(len(profiling.events))
+        if len(passes) == 3:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(TFD_new.time, 'sleep', sleep)
+    runner.watch(0, on_pass=lambda: TFD_new.report_profile(args))
+
+    # Every pass starts from an empty event list and the profile holds the latest pass only
+    assert passes == [0, 0, 0]
+    with open(args.profile) as f:
+        profile = json.load(f)
+    assert [event['stage'] for event in profile['events']] == ['incremental_pass']
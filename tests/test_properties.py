@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+
+import TFD_new
+
+
+def test_properties_match_per_curve_reference(processed_specimens):
+    specimens = [processed_specimens(), processed_specimens(compact=True)]
+    table = TFD_new.extract_properties(specimens)
+    for row, specimen in zip(table.itertuples(), specimens):
+        force, elongation = TFD_new.clipped_curve(specimen)
+        assert row.max_force == force.max()
+        assert row.elongation_at_max_force == elongation[np.argmax(force)]
+        assert row.force_at_fracture == force[-1]
+        assert row.elongation_at_fracture == elongation[-1]
+        assert np.isclose(row.energy, np.sum((force[1:] + force[:-1]) * np.diff(elongation)) / 2)
+        assert row.n_points == len(force)
+
+
+def test_iterator_input_with_profiler(processed_specimens, profiling):
+    specimens = [processed_specimens(), processed_specimens(compact=True)]
+    expected = TFD_new.extract_properties(specimens)
+    pd.testing.assert_frame_equal(TFD_new.extract_properties(iter(specimens)), expected)
+    event = [event for event in profiling.events if event['stage'] == 'extract_properties'][-1]
+    assert event['rows_out'] == expected['n_points'].sum()
@@ -0,0 +1,88 @@
+import gc
+import threading
+
+import numpy as np
+import pytest
+
+import TFD_new
+
+USECOLS = ['Time', 'ESH B Force', 'Analog In 1']
+
+
+@pytest.fixture
+def path(home_dir):
+    return TFD_new.specimen_data_file(home_dir, 'AIR', 'SYN1')
+
+
+def test_concurrent_acquire_parses_once(path, monkeypatch):
+    store = TFD_new.RawDataStore()
+    calls = []
+    read_mts793 = TFD_new.read_mts793
+
+    def counting_read(*args, **kwargs):
+        calls.append(args[0])
+        return read_mts793(*args, **kwargs)
+    monkeypatch.setattr(TFD_new, 'read_mts793', counting_read)
+
+    barrier = threading.Barrier(8)
+    results = []
+
+    def acquire():
+        barrier.wait()
+        results.append(store.acquire(path, USECOLS, cache=False))
+    threads = [threading.Thread(target=acquire) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert store.refs(path, USECOLS) == 8
+    columns = [result[0] for result in results]
+    assert all(c['Time'] is columns[0]['Time'] for c in columns)
+    assert not columns[0]['Time'].flags.writeable
+    for _, _, key in results:
+        store.release(key)
+    assert len(store) == 0 and store.nbytes == 0
+
+
+def test_owner_garbage_collection_releases(path):
+    store = TFD_new.RawDataStore()
+
+    class Owner:
+        pass
+    owners = [Owner(), Owner()]
+    for i in range(2):
+        store.acquire(path, USECOLS, cache=False, owner=owners[i])
+    assert store.refs(path, USECOLS) == 2
+    assert store.nbytes == 3 * 8 * 8000
+    del owners[0]
+    gc.collect()
+    assert store.refs(path, USECOLS) == 1
+    owners.clear()
+    gc.collect()
+    assert len(store) == 0
+
+
+def test_failed_read_releases_the_entry(path):
+    store = TFD_new.RawDataStore()
+    with pytest.raises(ValueError):
+        store.acquire(path, ['Time', 'No Such Column'], cache=False)
+    assert len(store) == 0
+
+
+def test_specimens_share_arrays(home_dir):
+    specimens = [TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A') for _ in range(2)]
+    for specimen in specimens:
+        specimen.read_csv(cache=False)
+    assert np.shares_memory(specimens[0].data_df['Time'].to_numpy(), specimens[1].data_df['Time'].to_numpy())
+
+
+def test_compact_specimens_share_read_only_views(home_dir):
+    specimens = [TFD_new.CompactSpecimen(home_dir, '', 'AIR', '', 'SYN1', 'A') for _ in range(2)]
+    for specimen in specimens:
+        specimen.read_csv(cache=False)
+    assert np.shares_memory(specimens[0].time, specimens[1].time)
+    assert not specimens[0].extensometer.flags.writeable
+    specimens[0].zero_extensometer()
+    assert not np.shares_memory(specimens[0].extensometer, specimens[1].extensometer)
@@ -0,0 +1,115 @@
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import TFD_new
+import generate_synthetic_TFD
+
+USECOLS = ['Time', 'ESH B Force', 'Analog In 1']
+
+
+@pytest.fixture
+def path(home_dir):
+    return TFD_new.specimen_data_file(home_dir, 'AIR', 'SYN1')
+
+
+def test_read_mts793_matches_pandas(path):
+    reference = pd.read_csv(path, sep='\t', skiprows=[0, 1, 2, 4], usecols=USECOLS)
+    columns, metadata = TFD_new.read_mts793(path, USECOLS)
+    assert list(columns) == USECOLS
+    for name in USECOLS:
+        np.testing.assert_array_equal(columns[name], reference[name].to_numpy())
+        assert columns[name].flags.c_contiguous
+    assert metadata['columns'][:2] == ['Time', 'ESH B Force']
+    assert metadata['units']['ESH B Force'] == 'kN'
+    assert metadata['timestamp'] is not None
+
+
+def test_read_mts793_float32(path):
+    reference = pd.read_csv(path, sep='\t', skiprows=[0, 1, 2, 4], usecols=USECOLS)
+    columns, _ = TFD_new.read_mts793(path, USECOLS, np.float32)
+    for name in USECOLS:
+        assert columns[name].dtype == np.float32
+        np.testing.assert_array_equal(columns[name], reference[name].to_numpy().astype(np.float32))
+
+
+def test_read_mts793_all_columns_and_missing(path):
+    columns, metadata = TFD_new.read_mts793(path)
+    assert list(columns) == metadata['columns']
+    with pytest.raises(ValueError):
+        TFD_new.read_mts793(path, ['Time', 'No Such Column'])
+
+
+def test_memmap_sidecar_matches_text(path, tmp_path):
+    columns, metadata = TFD_new.read_mts793(path, USECOLS)
+    mapped, mapped_metadata = TFD_new.open_sidecar(path, USECOLS, np.float64, cache_dir=str(tmp_path))
+    assert list(mapped) == USECOLS
+    for name in USECOLS:
+        np.testing.assert_array_equal(mapped[name], columns[name])
+    assert mapped_metadata['units'] == metadata['units']
+
+
+@pytest.fixture
+def share(path, tmp_path):
+    """Copy of the specimen.dat in its own folder, so sidecars written next to it stay in the test."""
+    copy = tmp_path / 'share' / 'specimen.dat'
+    copy.parent.mkdir()
+    shutil.copyfile(path, copy)
+    return str(copy)
+
+
+def assert_matches_text(mapped, path, usecols=USECOLS, dtype=np.float64):
+    columns, _ = TFD_new.read_mts793(path, usecols, dtype)
+    assert list(mapped) == list(columns)
+    for name in columns:
+        assert mapped[name].dtype == dtype
+        np.testing.assert_array_equal(mapped[name], columns[name])
+
+
+@pytest.mark.parametrize('dtype', [np.float64, np.float32])
+def test_memmap_sidecar_all_columns(share, tmp_path, dtype):
+    mapped, _ = TFD_new.open_sidecar(share, None, dtype, cache_dir=str(tmp_path / 'cache'))
+    assert os.path.exists(TFD_new.sidecar_path(share, dtype))
+    assert_matches_text(mapped, share, None, dtype)
+
+
+def test_memmap_sidecar_rebuilt_when_stale(share, tmp_path):
+    cache_dir = str(tmp_path / 'cache')
+    TFD_new.open_sidecar(share, USECOLS, cache_dir=cache_dir)
+    # A re-export of the specimen: new data, newer mtime
+    rng = np.random.default_rng(11)
+    generate_synthetic_TFD.write_specimen_dat(share, generate_synthetic_TFD.synthetic_curve(5000, rng), 'A', rng=rng)
+    stat = os.stat(share)
+    os.utime(share, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    with pytest.raises(FileNotFoundError):
+        TFD_new.open_sidecar(share, USECOLS, convert=False, cache_dir=cache_dir)
+
+    mapped, _ = TFD_new.open_sidecar(share, USECOLS, cache_dir=cache_dir)
+    assert len(mapped['Time']) == 5000
+    assert_matches_text(mapped, share)
+    header, _ = TFD_new.read_sidecar_header(TFD_new.sidecar_path(share))
+    assert header['source_mtime_ns'] == os.stat(share).st_mtime_ns
+
+
+def test_memmap_sidecar_read_only_share(share, tmp_path, monkeypatch):
+    cache_dir = str(tmp_path / 'cache')
+    write_atomic = TFD_new._write_atomic
+    share_dir = os.path.dirname(share)
+
+    def read_only(path, write):
+        if os.path.dirname(path) == share_dir:
+            raise PermissionError(13, 'Read-only file system', path)
+        return write_atomic(path, write)
+    monkeypatch.setattr(TFD_new, '_write_atomic', read_only)
+
+    mapped, _ = TFD_new.open_sidecar(share, USECOLS, cache_dir=cache_dir)
+    assert os.listdir(share_dir) == ['specimen.dat']
+    fallback = TFD_new._fallback_sidecar_path(share, np.float64, cache_dir)
+    assert os.path.exists(fallback)
+    assert_matches_text(mapped, share)
+    # Found again in the cache folder without converting
+    mapped, _ = TFD_new.open_sidecar(share, USECOLS, convert=False, cache_dir=cache_dir)
+    assert_matches_text(mapped, share)
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+import TFD_new
+
+
+def curve(n=3000, seed=0, sort=True):
+    rng = np.random.default_rng(seed)
+    x = rng.uniform(0, 8, n)
+    if sort:
+        x = np.sort(x)
+    y = 20 * (1 - np.exp(-x)) + rng.normal(0, 0.3, n)
+    # A few outliers for the robustifying iterations
+    y[rng.integers(0, n, 10)] += 5
+    return x, y
+
+
+@pytest.mark.parametrize('frac, it, delta', [(0.05, 3, 0.0), (0.2, 0, 0.0), (0.05, 2, 0.05), (2 / 3, 3, 0.0)])
+@pytest.mark.parametrize('sort', [True, False])
+def test_lowess_fast_matches_statsmodels(frac, it, delta, sort):
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+    x, y = curve(sort=sort)
+    expected = lowess(y, x, frac=frac, it=it, delta=delta, return_sorted=False)
+    np.testing.assert_allclose(TFD_new.lowess_fast(y, x, frac=frac, it=it, delta=delta), expected,
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_lowess_fast_with_tied_x():
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+    x, y = curve(2000)
+    x = np.round(x, 1)
+    expected = lowess(y, x, frac=0.1, return_sorted=False)
+    np.testing.assert_allclose(TFD_new.lowess_fast(y, x, frac=0.1), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_lowess_fast_rejects_bad_frac():
+    with pytest.raises(ValueError):
+        TFD_new.lowess_fast(*curve(100)[::-1], frac=1.5)
+
+
+def test_loess_smooth_engines_agree(home_dir):
+    smoothed = []
+    for engine in ('fast', 'statsmodels'):
+        specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+        specimen.read_csv(cache=False, shared=False)
+        specimen.load_clip()
+        specimen.zero_extensometer()
+        specimen.loess_smooth(0.05, engine=engine)
+        smoothed.append(specimen.clipped_df['Smoothed load'].to_numpy())
+    np.testing.assert_allclose(smoothed[0], smoothed[1], rtol=1e-9, atol=1e-9)
+
+
+@pytest.mark.parametrize('method', ['direct', 'fft', 'auto'])
+@pytest.mark.parametrize('window_size, polyorder', [(5, 2), (51, 3), (181, 2), (401, 4)])
+def test_savgol_smooth_matches_scipy(method, window_size, polyorder):
+    from scipy.signal import savgol_filter
+    _, y = curve(5000)
+    # The edge fits of long, high order windows differ from savgol_filter's polyfit in the last digits
+    np.testing.assert_allclose(TFD_new.savgol_smooth(y, window_size, polyorder, method),
+                               savgol_filter(y, window_size, polyorder, mode='interp'), rtol=1e-9, atol=1e-8)
+
+
+def test_savgol_smooth_rejects_bad_windows():
+    _, y = curve(100)
+    for window_size in (50, 2, 101):
+        with pytest.raises(ValueError):
+            TFD_new.savgol_smooth(y, window_size, 2)
+    with pytest.raises(ValueError):
+        TFD_new.savgol_smooth(y, 51, 2, method='spline')
+
+
+def test_savgol_batch_and_sweep_match_scipy(home_dir):
+    from scipy.signal import savgol_filter
+    loads = [curve(n, seed)[1] for n, seed in ((3000, 1), (4500, 2))]
+    smoothed = TFD_new.savgol_batch(loads, [51, (101, 3)])
+    assert set(smoothed) == {(51, 2), (101, 3)}
+    for (window_size, polyorder), curves in smoothed.items():
+        for load, result in zip(loads, curves):
+            np.testing.assert_allclose(result, savgol_filter(load, window_size, polyorder), rtol=1e-9, atol=1e-9)
+
+    specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    specimen.read_csv(cache=False, shared=False)
+    specimen.load_clip()
+    sweep = TFD_new.sav_gol_sweep([specimen], [181])
+    np.testing.assert_allclose(sweep[(181, 2)]['SYN1'],
+                               savgol_filter(specimen.clipped_df['ESH B Force'].to_numpy(), 181, 2),
+                               rtol=1e-9, atol=1e-9)
+
+
+def test_loess_smooth_default_delta(home_dir):
+    from statsmodels.nonparametric.smoothers_lowess import lowess
+    specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    specimen.read_csv(cache=False, shared=False)
+    specimen.load_clip()
+    specimen.zero_extensometer()
+    x = specimen.clipped_df['Analog In 1'].to_numpy()
+    y = specimen.clipped_df['ESH B Force'].to_numpy()
+    specimen.loess_smooth(0.05)
+    expected = lowess(y, x, frac=0.05, delta=TFD_new.LOWESS_DELTA * np.ptp(x), return_sorted=False)
+    np.testing.assert_allclose(specimen.clipped_df['Smoothed load'].to_numpy(), expected, rtol=1e-9, atol=1e-9)
+
+
+def test_derive_specimen_keys_the_lowess_delta(home_dir):
+    cache = TFD_new.DerivedCache(cache=False)
+    specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    specimen.read_csv(cache=False, shared=False)
+    key = cache.key(specimen, load_col='ESH B Force', window_size=None, frac=0.05,
+                    lowess_delta=TFD_new.LOWESS_DELTA, clip_value=1)
+    TFD_new.derive_specimen(specimen, frac=0.05, memo=cache)
+    assert cache.get(key) is not None
@@ -0,0 +1,100 @@
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import TFD_new
+import generate_synthetic_TFD
+
+USECOLS = ['Time', 'ESH B Force', 'Analog In 1']
+
+
+def reference(path, clip_value=1):
+    """read_mts793() followed by the load clip and the extensometer zeroing."""
+    columns, _ = TFD_new.read_mts793(path, USECOLS)
+    start, stop = TFD_new.find_test_bounds(columns['ESH B Force'], clip_value)
+    columns = {name: column[start:stop] for name, column in columns.items()}
+    columns['Analog In 1'] = columns['Analog In 1'] - columns['Analog In 1'][0]
+    return columns
+
+
+@pytest.fixture(scope='module')
+def dip_file(tmp_path_factory):
+    """Load dropping below the clip value early, before the maximum load."""
+    rng = np.random.default_rng(11)
+    curve = generate_synthetic_TFD.synthetic_curve(8000, rng)
+    curve['ESH B Force'][1000:1050] = 0.5
+    path = str(tmp_path_factory.mktemp('dip') / 'specimen.dat')
+    generate_synthetic_TFD.write_specimen_dat(path, curve, 'A', rng=rng)
+    return path
+
+
+@pytest.mark.parametrize('chunk_rows', [500, 3000, 1 << 16])
+def test_streaming_matches_read_then_clip(home_dir, dip_file, chunk_rows):
+    for path in (TFD_new.specimen_data_file(home_dir, 'AIR', 'SYN1'), dip_file):
+        expected = reference(path)
+        columns, _ = TFD_new.read_mts793_clipped(path, USECOLS, 'ESH B Force', 'Analog In 1',
+                                                 chunk_rows=chunk_rows)
+        assert list(columns) == USECOLS
+        for name in USECOLS:
+            np.testing.assert_array_equal(columns[name], expected[name])
+            assert columns[name].flags.c_contiguous
+
+
+def test_streaming_specimen_matches_full_read(home_dir):
+    full = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    full.read_csv(cache=False, shared=False)
+    full.load_clip()
+    full.zero_extensometer()
+    streamed = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    streamed.read_clipped(chunk_rows=1000)
+    np.testing.assert_array_equal(streamed.clipped_df[USECOLS].to_numpy(),
+                                  full.clipped_df[USECOLS].to_numpy())
+
+
+def _peak(func):
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_streaming_peak_memory_below_full_read(tmp_path):
+    rng = np.random.default_rng(2)
+    home_dir = str(tmp_path)
+    curve = generate_synthetic_TFD.synthetic_curve(200000, rng)
+    generate_synthetic_TFD.write_specimen_dat(TFD_new.specimen_data_file(home_dir, 'AIR', 'BIG1'), curve, 'A',
+                                              rng=rng)
+
+    def full():
+        specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'BIG1', 'A')
+        specimen.read_csv(cache=False, shared=False)
+        specimen.load_clip()
+        specimen.zero_extensometer()
+
+    def streamed():
+        TFD_new.Specimen(home_dir, '', 'AIR', '', 'BIG1', 'A').read_clipped(chunk_rows=1 << 12)
+
+    full_peak, streamed_peak = _peak(full), _peak(streamed)
+    # The output (3 x 8 bytes per row) plus one chunk, against the full read's parse buffers
+    assert streamed_peak < 0.7 * full_peak
+    assert streamed_peak < 1.5 * 3 * 8 * 200000
+
+
+def test_streaming_stops_once_the_end_is_confirmed(tmp_path):
+    rng = np.random.default_rng(4)
+    curve = generate_synthetic_TFD.synthetic_curve(20000, rng)
+    stop = TFD_new.find_test_bounds(curve['ESH B Force'])[1]
+    # A second, higher test far after fracture
+    curve['ESH B Force'][-50:] = curve['ESH B Force'].max() + 5
+    path = str(tmp_path / 'specimen.dat')
+    generate_synthetic_TFD.write_specimen_dat(path, curve, 'A', rng=rng)
+
+    columns, _ = TFD_new.read_mts793_clipped(path, USECOLS, 'ESH B Force', 'Analog In 1', chunk_rows=50,
+                                             confirm_rows=100)
+    assert len(columns['Time']) == stop
+    columns, _ = TFD_new.read_mts793_clipped(path, USECOLS, 'ESH B Force', 'Analog In 1', chunk_rows=50,
+                                             confirm_rows=None)
+    np.testing.assert_array_equal(columns['Time'], reference(path)['Time'])
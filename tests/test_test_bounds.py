@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+import TFD_new
+
+
+def bounds_reference(load, clip_value=1):
+    """First sample after the maximum load below clip_value, by a plain loop."""
+    peak = int(np.argmax(load))
+    for i in range(peak + 1, len(load)):
+        if load[i] < clip_value:
+            return 0, i
+    return 0, len(load)
+
+
+def load_record(n, seed):
+    rng = np.random.default_rng(seed)
+    t = np.linspace(0, 1, n)
+    load = 25 * np.sin(np.pi * t) + rng.normal(0, 0.5, n)
+    # Noise lifting the load above the clip value again after fracture
+    load[int(0.95 * n):] = rng.uniform(-2, 2, n - int(0.95 * n))
+    return load
+
+
+@pytest.mark.parametrize('seed', range(5))
+@pytest.mark.parametrize('chunk_rows', [7, 1024, 1 << 14])
+def test_find_test_bounds_matches_reference(seed, chunk_rows):
+    load = load_record(20000, seed)
+    assert TFD_new.find_test_bounds(load, 1, chunk_rows) == bounds_reference(load, 1)
+
+
+def test_find_test_bounds_edge_cases():
+    assert TFD_new.find_test_bounds(np.array([])) == (0, 0)
+    # Never drops below the clip value
+    assert TFD_new.find_test_bounds(np.array([2.0, 5.0, 3.0])) == (0, 3)
+    # Maximum on the last sample
+    assert TFD_new.find_test_bounds(np.array([0.0, 0.5, 3.0])) == (0, 3)
+    # Dips before the maximum do not end the test
+    assert TFD_new.find_test_bounds(np.array([2.0, 0.5, 4.0, 0.2, 3.0])) == (0, 3)
+
+
+def test_load_clip_uses_views(home_dir):
+    specimen = TFD_new.Specimen(home_dir, '', 'AIR', '', 'SYN1', 'A')
+    specimen.read_csv(cache=False, shared=False)
+    specimen.load_clip()
+    load = specimen.data_df['ESH B Force'].to_numpy()
+    assert (specimen.clip_start, specimen.clip_stop) == bounds_reference(load)
+    assert len(specimen.clipped_df) == specimen.clip_stop
+    assert np.shares_memory(specimen.clipped_df['ESH B Force'].to_numpy(), load)